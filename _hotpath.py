@@ -0,0 +1,50 @@
+"""
+Per-request image helpers used by main.py.
+This module is plain Python and is also the Cython source: build it in place
+with `cythonize -i _hotpath.py` and the compiled extension is imported instead.
+"""
+
+import base64
+from typing import List, Optional
+
+# Data URL prefixes for the image formats the model accepts, keyed by MIME type
+DEFAULT_IMAGE_MIME = "image/jpeg"
+DATA_URL_PREFIXES = {
+    mime: f"data:{mime};base64,"
+    for mime in ("image/jpeg", "image/png", "image/gif", "image/webp")
+}
+
+def detect_image_mime(header: bytes) -> str:
+    """Detect the image MIME type from its leading magic bytes"""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return DEFAULT_IMAGE_MIME
+
+def base64_to_data_url(image_base64: str) -> str:
+    """Wrap a base64 image in a data URL labelled with its detected MIME type"""
+    try:
+        # 16 base64 characters decode to the first 12 bytes, enough for every signature
+        header = base64.b64decode(image_base64[:16])
+    except ValueError:
+        header = b""
+    return DATA_URL_PREFIXES[detect_image_mime(header)] + image_base64
+
+def build_image_messages(image_url: str, instruction: str, user_text: Optional[str] = None) -> List[dict]:
+    """Build image chat messages with the instruction as a stable system prefix.
+
+    The variable parts (image, then any user text) come last so requests sharing
+    an instruction share a prompt prefix the provider can cache.
+    """
+    content = [{"type": "image_url", "image_url": {"url": image_url}}]
+    if user_text:
+        content.append({"type": "text", "text": user_text})
+    return [
+        {"role": "system", "content": instruction},
+        {"role": "user", "content": content}
+    ]
@@ -1,29 +1,163 @@
 import os
+import asyncio
 import base64
+import hashlib
 import io
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
 from typing import Optional, List
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from openai import OpenAI
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
+import httpx
+import orjson
 import uvicorn
 
+import _hotpath
+from _hotpath import DATA_URL_PREFIXES, DEFAULT_IMAGE_MIME, base64_to_data_url, build_image_messages, detect_image_mime
+
+try:
+    import pybase64
+except ImportError:  # PyPy / free-threaded builds without wheels
+    pybase64 = None
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+b64encode = pybase64.b64encode if pybase64 is not None else base64.b64encode
+
+# Read uploads in chunks that are a multiple of 3 bytes so each chunk
+# encodes to base64 without padding and can be concatenated directly
+IMAGE_CHUNK_SIZE = 3 * 64 * 1024
+
+# Reusable output buffers for base64 encoding, bucketed by capacity. This saves
+# the growing output buffer per upload; chunk encoding and the final str still
+# allocate. Each worker keeps at most BUFFER_POOL_DEPTH buffers per bucket
+# (~5.3 MiB per unit of depth). Handlers run on a single event loop, so no locking.
+BUFFER_BUCKETS = (64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024)
+BUFFER_POOL_DEPTH = int(os.getenv("BUFFER_POOL_DEPTH", "2"))
+_buffer_pool: "dict[int, deque[bytearray]]" = {size: deque() for size in BUFFER_BUCKETS}
+
+# Logged through uvicorn's error logger so it appears in the server output
+logger = logging.getLogger("uvicorn.error")
+logger.info(
+    "Image helpers: %s",
+    "pure Python" if _hotpath.__file__.endswith(".py") else "compiled with Cython"
+)
+
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Initialize OpenAI client on a shared HTTP/2 connection pool so TLS
+# sessions are reused and concurrent requests are multiplexed
+client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=DefaultAsyncHttpxClient(
+        http2=True,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+    )
+)
+
+# Response cache settings (exact-match, in-process)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+_response_cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+# Completions currently in flight, so identical concurrent requests share one call
+_inflight: "dict[str, asyncio.Task]" = {}
+
+# Largest image accepted (default 20 MiB), whether uploaded raw or sent as base64.
+# Request bodies may hold the base64 form of such an image plus 1 MiB of
+# prompt, history and form overhead.
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_IMAGE_BASE64_LENGTH = 4 * -(-MAX_UPLOAD_BYTES // 3)
+MAX_REQUEST_BYTES = MAX_IMAGE_BASE64_LENGTH + 1024 * 1024
+
+# Prompt budget for conversation history sent to the model
+MAX_HISTORY_TOKENS = int(os.getenv("MAX_HISTORY_TOKENS", "4096"))
+IMAGE_TOKEN_ESTIMATE = 765  # Cost of a high-detail 1024x1024 image
+_encoding = None  # tiktoken encoding, loaded in the background at startup; False when unavailable
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the token encoding on startup and close the OpenAI connection pool on shutdown"""
+    # The first load downloads the BPE file with no timeout, so it runs in a daemon
+    # thread that startup never waits on; token counts are estimated until it is done
+    threading.Thread(target=load_encoding, name="load-encoding", daemon=True).start()
+    yield
+    await client.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="GPT-5 Multimodal Chat API",
     description="A FastAPI backend for GPT-5 multimodal chat with image and text support",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Add CORS middleware for React frontend
+class UploadSizeLimitMiddleware:
+    """Reject oversized bodies, up front from Content-Length or while they stream in"""
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_bytes:
+                    await self.reject(scope, receive, send)
+                    return
+                break
+        
+        # Chunked bodies carry no Content-Length, so count the bytes as they arrive
+        received = 0
+        response_started = False
+        
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Body parsing re-raises HTTPException, so FastAPI answers 413
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+        
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except HTTPException as e:
+            # Raised outside FastAPI's handlers (e.g. from a raw stream read)
+            if e.status_code != 413 or response_started:
+                raise
+            await self.reject(scope, receive, send)
+
+    async def reject(self, scope, receive, send):
+        response = ORJSONResponse(status_code=413, content={"detail": "Request body too large"})
+        await response(scope, receive, send)
+
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_REQUEST_BYTES)
+
+# Add CORS middleware for React frontend (added last so it also wraps rejected requests)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, replace with specific origins
@@ -32,93 +166,298 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Preset prompts and static responses, built once at import
+DEFAULT_IMAGE_PROMPT = "Analyze this image"
+
+PRESET_PROMPTS = {
+    "analyze": "Analyze this image in detail. Describe what you see, identify key elements, colors, composition, and any notable features.",
+    "summarize": "Provide a concise summary of what's shown in this image in 2-3 sentences.",
+    "describe": "Describe this image as if you're explaining it to someone who cannot see it. Be detailed and specific.",
+    "extract_text": "Extract and transcribe any text visible in this image. If no text is present, say 'No text detected'.",
+    "identify_objects": "Identify and list all the objects, people, or items you can see in this image.",
+    "explain_context": "Explain the context and setting of this image. What's happening? Where might this be taken?"
+}
+
+PRESETS_INFO = {
+    "presets": [
+        {"key": "analyze", "label": "Analyze Image", "description": "Detailed analysis of the image"},
+        {"key": "summarize", "label": "Summarize", "description": "Quick summary of image content"},
+        {"key": "describe", "label": "Describe", "description": "Detailed description for accessibility"},
+        {"key": "extract_text", "label": "Extract Text", "description": "Extract any text from the image"},
+        {"key": "identify_objects", "label": "Identify Objects", "description": "List objects and items in the image"},
+        {"key": "explain_context", "label": "Explain Context", "description": "Explain the setting and context"}
+    ]
+}
+
+API_INFO = {
+    "message": "GPT-5 Multimodal Chat API",
+    "version": "1.0.0",
+    "endpoints": {
+        "/chat/text": "Text-only chat with GPT-5",
+        "/chat/image-upload": "Upload image and chat with GPT-5",
+        "/chat/image-base64": "Send base64 image and chat with GPT-5",
+        "/presets": "Get available preset actions for images"
+    }
+}
+
 # Pydantic models
 class TextChatRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     message: str
-    conversation_history: Optional[List[dict]] = []
+    conversation_history: List[dict] = Field(default_factory=list)
 
 class TextChatResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     response: str
     conversation_history: List[dict]
 
 class ImageAnalysisRequest(BaseModel):
-    image_base64: str
-    prompt: Optional[str] = "Analyze this image"
+    model_config = ConfigDict(extra='ignore')
+
+    # Rejected at validation time when larger than the upload limit
+    image_base64: Optional[str] = Field(None, max_length=MAX_IMAGE_BASE64_LENGTH)
+    image_url: Optional[str] = None  # Publicly reachable URL, sent to the model as-is
+    prompt: Optional[str] = None  # Defaults to DEFAULT_IMAGE_PROMPT as the system instruction
     preset_action: Optional[str] = None  # "analyze", "summarize", "describe", etc.
 
 class ImageAnalysisResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     response: str
     analysis_type: str
 
 # Helper functions
-def encode_image_to_base64(image_file: UploadFile) -> str:
-    """Convert uploaded image to base64 string"""
+def acquire_buffer(size: int) -> bytearray:
+    """Get a buffer of at least size bytes, reusing a pooled one when possible"""
+    for bucket in BUFFER_BUCKETS:
+        if size <= bucket:
+            pool = _buffer_pool[bucket]
+            return pool.pop() if pool else bytearray(bucket)
+    return bytearray(size)
+
+def release_buffer(buffer: bytearray) -> None:
+    """Return a buffer to its pool; unbucketed or surplus buffers are dropped"""
+    pool = _buffer_pool.get(len(buffer))
+    if pool is not None and len(pool) < BUFFER_POOL_DEPTH:
+        pool.append(buffer)
+
+async def encode_image_to_data_url(image_file: UploadFile) -> str:
+    """Convert uploaded image to a base64 data URL, encoding it chunk by chunk"""
     try:
-        image_data = image_file.file.read()
-        base64_string = base64.b64encode(image_data).decode('utf-8')
-        return base64_string
+        # Starlette records the upload size, which fixes the encoded length. Without
+        # it the buffer has to grow as it goes, so it is not taken from the pool.
+        if image_file.size:
+            encoded_size = 4 * -(-max(image_file.size, 1) // 3) + max(map(len, DATA_URL_PREFIXES.values()))
+            buffer = acquire_buffer(encoded_size)
+        else:
+            buffer = bytearray()
+        capacity = len(buffer)
+        try:
+            size = 0
+            end = 0
+            # UploadFile.read runs disk reads in a thread, keeping the event loop free
+            while chunk := await image_file.read(IMAGE_CHUNK_SIZE):
+                if end == 0:
+                    # The prefix is written into the same buffer as the payload
+                    prefix = DATA_URL_PREFIXES[detect_image_mime(chunk[:12])].encode('ascii')
+                    buffer[:len(prefix)] = prefix
+                    end = len(prefix)
+                # The body cap leaves room for base64 and form overhead, so the
+                # raw image limit is checked here
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail="Image too large")
+                encoded = b64encode(chunk)
+                buffer[end:end + len(encoded)] = encoded
+                end += len(encoded)
+            if end == 0:
+                return DATA_URL_PREFIXES[DEFAULT_IMAGE_MIME]
+            with memoryview(buffer) as view:
+                return str(view[:end], 'ascii')
+        finally:
+            # A buffer that grew past its bucket (wrong recorded size) is not pooled
+            if capacity and len(buffer) == capacity:
+                release_buffer(buffer)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing image: {str(e)}")
 
+def load_encoding() -> None:
+    """Load the gpt-4o tiktoken encoding once, recording a failure so it is not retried"""
+    global _encoding
+    if tiktoken is None:
+        _encoding = False
+        return
+    try:
+        _encoding = tiktoken.encoding_for_model("gpt-4o")
+    except Exception:
+        _encoding = False
+
+def count_text_tokens(text: str) -> int:
+    """Count tokens with tiktoken, or estimate ~4 characters per token without it"""
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+def count_message_tokens(message: dict) -> int:
+    """Estimate the prompt tokens used by a single chat message"""
+    content = message.get("content")
+    tokens = 4  # Per-message formatting overhead
+    if isinstance(content, str):
+        return tokens + count_text_tokens(content)
+    for part in content or []:
+        if part.get("type") == "text":
+            tokens += count_text_tokens(part.get("text", ""))
+        else:
+            tokens += IMAGE_TOKEN_ESTIMATE
+    return tokens
+
+def trim_history(messages: List[dict], max_tokens: int = MAX_HISTORY_TOKENS) -> List[dict]:
+    """Keep the most recent messages that fit in max_tokens.
+
+    Leading system messages and the latest message are always kept; older turns
+    are dropped from the front of the conversation first.
+    """
+    start = 0
+    while start < len(messages) and messages[start].get("role") == "system":
+        start += 1
+    system, turns = messages[:start], messages[start:]
+    
+    budget = max_tokens - sum(count_message_tokens(m) for m in system)
+    keep = 0
+    for message in reversed(turns):
+        budget -= count_message_tokens(message)
+        if budget < 0 and keep:
+            break
+        keep += 1
+    
+    if keep == len(turns):
+        return messages
+    return system + turns[len(turns) - keep:]
+
+def validate_image_upload(image: UploadFile = File(...)) -> UploadFile:
+    """Reject non-image uploads before the handler reads or encodes them"""
+    if not (image.content_type or "").startswith('image/'):
+        raise HTTPException(status_code=400, detail="File must be an image")
+    return image
+
+def completion_cache_key(messages: List[dict], model: str, max_tokens: int, temperature: float) -> str:
+    """Hash the model parameters and messages (including any image data) into a cache key.
+
+    Image URLs are fed to the hash directly and replaced by their length in the
+    serialized structure, so multi-MB data URLs are never copied into JSON.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(f"{model}|{max_tokens}|{temperature}|".encode())
+    
+    structure = []
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, list):
+            parts = []
+            for part in content:
+                if isinstance(part, dict) and part.get("type") == "image_url":
+                    url = part["image_url"]["url"]
+                    digest.update(url.encode())
+                    part = {**part, "image_url": {**part["image_url"], "url": len(url)}}
+                parts.append(part)
+            message = {**message, "content": parts}
+        structure.append(message)
+    
+    digest.update(orjson.dumps(structure, option=orjson.OPT_SORT_KEYS))
+    return digest.hexdigest()
+
+async def cached_completion(
+    messages: List[dict],
+    model: str = "gpt-4o",  # Using GPT-4o as GPT-5 might not be available yet
+    max_tokens: int = 2048,
+    temperature: float = 0.7,
+    prompt_cache_key: Optional[str] = None
+) -> str:
+    """Call the chat completions API, reusing the response for identical requests"""
+    key = completion_cache_key(messages, model, max_tokens, temperature)
+    
+    cached = _response_cache.get(key)
+    if cached is not None:
+        expires_at, content = cached
+        if expires_at > time.monotonic():
+            _response_cache.move_to_end(key)
+            return content
+        del _response_cache[key]
+    
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(create_completion(
+            key, messages, model, max_tokens, temperature, prompt_cache_key
+        ))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: finish_inflight(key, done))
+    
+    # Shielded so one caller disconnecting does not cancel the call for the others
+    return await asyncio.shield(task)
+
+async def create_completion(
+    key: str,
+    messages: List[dict],
+    model: str,
+    max_tokens: int,
+    temperature: float,
+    prompt_cache_key: Optional[str]
+) -> str:
+    """Call the chat completions API and store the response in the cache"""
+    response = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        # Routes requests sharing a prompt prefix to the same provider-side cache
+        extra_body={"prompt_cache_key": prompt_cache_key} if prompt_cache_key else None
+    )
+    content = response.choices[0].message.content
+    
+    if RESPONSE_CACHE_SIZE > 0:
+        _response_cache[key] = (time.monotonic() + RESPONSE_CACHE_TTL, content)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+    
+    return content
+
+def finish_inflight(key: str, task: asyncio.Task) -> None:
+    """Drop a finished completion from the in-flight map"""
+    _inflight.pop(key, None)
+    # Mark any error as retrieved in case every waiter has already gone away
+    if not task.cancelled():
+        task.exception()
+
 def get_preset_prompt(action: str) -> str:
     """Get predefined prompts for preset actions"""
-    presets = {
-        "analyze": "Analyze this image in detail. Describe what you see, identify key elements, colors, composition, and any notable features.",
-        "summarize": "Provide a concise summary of what's shown in this image in 2-3 sentences.",
-        "describe": "Describe this image as if you're explaining it to someone who cannot see it. Be detailed and specific.",
-        "extract_text": "Extract and transcribe any text visible in this image. If no text is present, say 'No text detected'.",
-        "identify_objects": "Identify and list all the objects, people, or items you can see in this image.",
-        "explain_context": "Explain the context and setting of this image. What's happening? Where might this be taken?"
-    }
-    return presets.get(action, "Analyze this image")
+    return PRESET_PROMPTS.get(action, DEFAULT_IMAGE_PROMPT)
 
 # API Endpoints
 
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "message": "GPT-5 Multimodal Chat API",
-        "version": "1.0.0",
-        "endpoints": {
-            "/chat/text": "Text-only chat with GPT-5",
-            "/chat/image-upload": "Upload image and chat with GPT-5",
-            "/chat/image-base64": "Send base64 image and chat with GPT-5",
-            "/presets": "Get available preset actions for images"
-        }
-    }
+    return API_INFO
 
 @app.get("/presets")
 async def get_presets():
     """Get available preset actions for image analysis"""
-    return {
-        "presets": [
-            {"key": "analyze", "label": "Analyze Image", "description": "Detailed analysis of the image"},
-            {"key": "summarize", "label": "Summarize", "description": "Quick summary of image content"},
-            {"key": "describe", "label": "Describe", "description": "Detailed description for accessibility"},
-            {"key": "extract_text", "label": "Extract Text", "description": "Extract any text from the image"},
-            {"key": "identify_objects", "label": "Identify Objects", "description": "List objects and items in the image"},
-            {"key": "explain_context", "label": "Explain Context", "description": "Explain the setting and context"}
-        ]
-    }
+    return PRESETS_INFO
 
 @app.post("/chat/text", response_model=TextChatResponse)
 async def text_chat(request: TextChatRequest):
     """Text-only chat with GPT-5"""
     try:
-        # Prepare conversation history
-        messages = request.conversation_history.copy() if request.conversation_history else []
-        messages.append({"role": "user", "content": request.message})
+        # Prepare conversation history in a single new list; the assistant reply
+        # is appended to it below, so the request's history is never copied twice
+        messages = [*request.conversation_history, {"role": "user", "content": request.message}]
         
         # Call GPT-5 API
-        response = client.chat.completions.create(
-            model="gpt-4o",  # Using GPT-4o as GPT-5 might not be available yet
-            messages=messages,
-            max_tokens=2048,
-            temperature=0.7
-        )
-        
-        assistant_response = response.choices[0].message.content
+        assistant_response = await cached_completion(trim_history(messages))
         
         # Update conversation history
         messages.append({"role": "assistant", "content": assistant_response})
@@ -133,101 +472,72 @@ async def text_chat(request: TextChatRequest):
 
 @app.post("/chat/image-upload")
 async def image_upload_chat(
-    image: UploadFile = File(...),
+    image: UploadFile = Depends(validate_image_upload),
     prompt: Optional[str] = Form(None),
     preset_action: Optional[str] = Form(None)
 ):
     """Upload an image file and chat with GPT-5"""
     try:
-        # Validate image file
-        if not image.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="File must be an image")
-        
-        # Convert image to base64
-        base64_image = encode_image_to_base64(image)
+        # Convert image to a base64 data URL
+        image_url = await encode_image_to_data_url(image)
         
         # Determine the prompt to use
+        user_text = None
         if preset_action:
-            final_prompt = get_preset_prompt(preset_action)
+            instruction = get_preset_prompt(preset_action)
             analysis_type = preset_action
         elif prompt:
-            final_prompt = prompt
+            instruction = DEFAULT_IMAGE_PROMPT
+            user_text = prompt
             analysis_type = "custom"
         else:
-            final_prompt = "Analyze this image"
+            instruction = DEFAULT_IMAGE_PROMPT
             analysis_type = "default"
         
         # Prepare the message for GPT-5
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": final_prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
-                        }
-                    }
-                ]
-            }
-        ]
+        messages = build_image_messages(image_url, instruction, user_text)
         
         # Call GPT-5 API
-        response = client.chat.completions.create(
-            model="gpt-4o",  # Using GPT-4o for vision capabilities
-            messages=messages,
-            max_tokens=2048,
-            temperature=0.7
-        )
-        
-        assistant_response = response.choices[0].message.content
+        assistant_response = await cached_completion(messages, prompt_cache_key=analysis_type)
         
         return ImageAnalysisResponse(
             response=assistant_response,
             analysis_type=analysis_type
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
 
 @app.post("/chat/image-base64", response_model=ImageAnalysisResponse)
 async def image_base64_chat(request: ImageAnalysisRequest):
-    """Send base64 encoded image and chat with GPT-5"""
+    """Send a base64 encoded image (or an image URL) and chat with GPT-5"""
+    if not request.image_base64 and not request.image_url:
+        raise HTTPException(status_code=400, detail="Either image_base64 or image_url is required")
+
     try:
         # Determine the prompt to use
+        user_text = None
         if request.preset_action:
-            final_prompt = get_preset_prompt(request.preset_action)
+            instruction = get_preset_prompt(request.preset_action)
             analysis_type = request.preset_action
         else:
-            final_prompt = request.prompt or "Analyze this image"
+            instruction = DEFAULT_IMAGE_PROMPT
+            user_text = request.prompt
             analysis_type = "custom" if request.prompt else "default"
         
+        # Hosted images are passed by reference, skipping the base64 payload
+        if request.image_url:
+            image_url = request.image_url
+        else:
+            image_url = base64_to_data_url(request.image_base64)
+        
         # Prepare the message for GPT-5
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": final_prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{request.image_base64}"
-                        }
-                    }
-                ]
-            }
-        ]
+        messages = build_image_messages(image_url, instruction, user_text)
         
         # Call GPT-5 API
-        response = client.chat.completions.create(
-            model="gpt-4o",  # Using GPT-4o for vision capabilities
-            messages=messages,
-            max_tokens=2048,
-            temperature=0.7
-        )
-        
-        assistant_response = response.choices[0].message.content
+        assistant_response = await cached_completion(messages, prompt_cache_key=analysis_type)
         
         return ImageAnalysisResponse(
             response=assistant_response,
@@ -245,14 +555,12 @@ async def multimodal_chat(
 ):
     """Combined endpoint for both text and image input"""
     try:
-        import json
-        
         # Parse conversation history if provided
         messages = []
         if conversation_history:
             try:
-                messages = json.loads(conversation_history)
-            except json.JSONDecodeError:
+                messages = orjson.loads(conversation_history)
+            except orjson.JSONDecodeError:
                 messages = []
         
         # Prepare the current message
@@ -266,25 +574,17 @@ async def multimodal_chat(
         
         # Add image if provided
         if image and image.content_type.startswith('image/'):
-            base64_image = encode_image_to_base64(image)
             current_message["content"].append({
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/jpeg;base64,{base64_image}"
+                    "url": await encode_image_to_data_url(image)
                 }
             })
         
         messages.append(current_message)
         
         # Call GPT-5 API
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            max_tokens=2048,
-            temperature=0.7
-        )
-        
-        assistant_response = response.choices[0].message.content
+        assistant_response = await cached_completion(trim_history(messages))
         
         # Update conversation history
         messages.append({"role": "assistant", "content": assistant_response})
@@ -295,13 +595,21 @@ async def multimodal_chat(
             "has_image": image is not None
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing multimodal chat: {str(e)}")
 
 if __name__ == "__main__":
+    # uvicorn picks uvloop and httptools automatically when they are installed
+    # Single reloading process by default. Each worker keeps its own response
+    # cache, in-flight map and buffer pool, so extra workers are opt-in.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    reload = workers == 1 and os.getenv("RELOAD", "true").lower() in ("1", "true")
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=reload,
+        workers=workers
     )
@@ -4,7 +4,8 @@ Test script for GPT-5 Multimodal API
 This script demonstrates how to use all the API endpoints
 """
 
-import requests
+import asyncio
+import httpx
 import json
 import base64
 from pathlib import Path
@@ -12,23 +13,23 @@ from pathlib import Path
 # API base URL
 BASE_URL = "http://localhost:8000"
 
-def test_root_endpoint():
+async def test_root_endpoint(client: httpx.AsyncClient):
     """Test the root endpoint"""
     print("🔍 Testing root endpoint...")
-    response = requests.get(f"{BASE_URL}/")
+    response = await client.get("/")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     print("-" * 50)
 
-def test_presets_endpoint():
+async def test_presets_endpoint(client: httpx.AsyncClient):
     """Test the presets endpoint"""
     print("🔍 Testing presets endpoint...")
-    response = requests.get(f"{BASE_URL}/presets")
+    response = await client.get("/presets")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     print("-" * 50)
 
-def test_text_chat():
+async def test_text_chat(client: httpx.AsyncClient):
     """Test text-only chat"""
     print("🔍 Testing text chat endpoint...")
     
@@ -37,7 +38,7 @@ def test_text_chat():
         "conversation_history": []
     }
     
-    response = requests.post(f"{BASE_URL}/chat/text", json=data)
+    response = await client.post("/chat/text", json=data)
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -48,7 +49,7 @@ def test_text_chat():
         print(f"Error: {response.text}")
     print("-" * 50)
 
-def test_image_base64_chat():
+async def test_image_base64_chat(client: httpx.AsyncClient):
     """Test image analysis with base64 encoded image"""
     print("🔍 Testing image base64 chat endpoint...")
     
@@ -62,7 +63,7 @@ def test_image_base64_chat():
         "preset_action": None
     }
     
-    response = requests.post(f"{BASE_URL}/chat/image-base64", json=data)
+    response = await client.post("/chat/image-base64", json=data)
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -73,7 +74,35 @@ def test_image_base64_chat():
         print(f"Error: {response.text}")
     print("-" * 50)
 
-def test_preset_actions():
+async def test_image_url_chat(client: httpx.AsyncClient):
+    """Test image analysis with a hosted image URL"""
+    print("🔍 Testing image URL chat endpoint...")
+    
+    data = {
+        "image_url": "https://upload.wikimedia.org/wikipedia/commons/4/47/PNG_transparency_demonstration_1.png",
+        "prompt": "What do you see in this image?"
+    }
+    
+    response = await client.post("/chat/image-base64", json=data)
+    print(f"Status: {response.status_code}")
+    
+    if response.status_code == 200:
+        result = response.json()
+        print(f"Response: {result['response']}")
+        print(f"Analysis type: {result['analysis_type']}")
+    else:
+        print(f"Error: {response.text}")
+    print("-" * 50)
+
+async def run_preset(client: httpx.AsyncClient, image_b64: str, preset: str) -> httpx.Response:
+    """Send a single preset action request"""
+    data = {
+        "image_base64": image_b64,
+        "preset_action": preset
+    }
+    return await client.post("/chat/image-base64", json=data)
+
+async def test_preset_actions(client: httpx.AsyncClient):
     """Test preset actions with image"""
     print("🔍 Testing preset actions...")
     
@@ -82,14 +111,11 @@ def test_preset_actions():
     
     presets = ["analyze", "summarize", "describe"]
     
-    for preset in presets:
+    # Fire all preset requests concurrently, then report them in order
+    responses = await asyncio.gather(*(run_preset(client, test_image_b64, p) for p in presets))
+    
+    for preset, response in zip(presets, responses):
         print(f"Testing preset: {preset}")
-        data = {
-            "image_base64": test_image_b64,
-            "preset_action": preset
-        }
-        
-        response = requests.post(f"{BASE_URL}/chat/image-base64", json=data)
         print(f"Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -99,21 +125,24 @@ def test_preset_actions():
             print(f"Error: {response.text}")
         print()
 
-def main():
+async def main():
     """Run all tests"""
     print("🚀 Starting GPT-5 Multimodal API Tests")
     print("=" * 60)
     
     try:
-        test_root_endpoint()
-        test_presets_endpoint()
-        test_text_chat()
-        test_image_base64_chat()
-        test_preset_actions()
+        # One client for all tests so the connection is reused
+        async with httpx.AsyncClient(base_url=BASE_URL, http2=True, timeout=120.0) as client:
+            await test_root_endpoint(client)
+            await test_presets_endpoint(client)
+            await test_text_chat(client)
+            await test_image_base64_chat(client)
+            await test_image_url_chat(client)
+            await test_preset_actions(client)
         
         print("✅ All tests completed!")
         
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Error: Could not connect to the API server.")
         print("Make sure the server is running on http://localhost:8000")
         print("Run: python3 main.py")
@@ -121,4 +150,4 @@ def main():
         print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""
+Tests for the completion response cache and in-flight request coalescing
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import main
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+class StubCompletions:
+    """Stand-in for client.chat.completions.create that counts calls"""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        message = SimpleNamespace(content=f"reply {self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    """Start every test with an empty cache and no in-flight calls"""
+    monkeypatch.setattr(main, "_response_cache", main.OrderedDict())
+    monkeypatch.setattr(main, "_inflight", {})
+
+
+def stub_api(monkeypatch, error=None) -> StubCompletions:
+    stub = StubCompletions(error)
+    monkeypatch.setattr(main.client.chat.completions, "create", stub.create)
+    return stub
+
+
+def test_concurrent_identical_calls_share_one_request(monkeypatch):
+    """N concurrent identical calls hit the API once and all get its response"""
+    async def run():
+        stub = stub_api(monkeypatch)
+        waiters = [asyncio.create_task(main.cached_completion(MESSAGES)) for _ in range(5)]
+        await asyncio.sleep(0)
+        stub.release.set()
+        return stub, await asyncio.gather(*waiters)
+
+    stub, results = asyncio.run(run())
+    assert stub.calls == 1
+    assert results == ["reply 1"] * 5
+    assert main._inflight == {}
+
+
+def test_failed_call_raises_in_every_waiter(monkeypatch):
+    """An API error reaches every waiter and leaves nothing in flight or cached"""
+    async def run():
+        stub = stub_api(monkeypatch, error=RuntimeError("upstream failed"))
+        waiters = [asyncio.create_task(main.cached_completion(MESSAGES)) for _ in range(3)]
+        await asyncio.sleep(0)
+        stub.release.set()
+        return stub, await asyncio.gather(*waiters, return_exceptions=True)
+
+    stub, results = asyncio.run(run())
+    assert stub.calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert main._inflight == {}
+    assert len(main._response_cache) == 0
+
+
+def test_cancelling_one_waiter_keeps_the_others(monkeypatch):
+    """A cancelled caller does not cancel the shared call for the remaining waiters"""
+    async def run():
+        stub = stub_api(monkeypatch)
+        waiters = [asyncio.create_task(main.cached_completion(MESSAGES)) for _ in range(3)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        await asyncio.sleep(0)
+        stub.release.set()
+        return stub, await asyncio.gather(*waiters, return_exceptions=True)
+
+    stub, results = asyncio.run(run())
+    assert stub.calls == 1
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == ["reply 1", "reply 1"]
+
+
+def test_cached_response_is_reused_until_it_expires(monkeypatch):
+    """A repeated request is served from the cache until its TTL passes"""
+    async def run():
+        stub = stub_api(monkeypatch)
+        stub.release.set()
+        first = await main.cached_completion(MESSAGES)
+        second = await main.cached_completion(MESSAGES)
+        monkeypatch.setattr(main, "RESPONSE_CACHE_TTL", -1)
+        main._response_cache.clear()
+        await main.cached_completion(MESSAGES)
+        third = await main.cached_completion(MESSAGES)
+        return stub, first, second, third
+
+    stub, first, second, third = asyncio.run(run())
+    assert first == second == "reply 1"
+    assert third == "reply 3"
+    assert stub.calls == 3
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    """The cache holds at most RESPONSE_CACHE_SIZE entries, dropping the oldest"""
+    async def run():
+        stub = stub_api(monkeypatch)
+        stub.release.set()
+        monkeypatch.setattr(main, "RESPONSE_CACHE_SIZE", 2)
+        for text in ("a", "b", "c"):
+            await main.cached_completion([{"role": "user", "content": text}])
+        await main.cached_completion([{"role": "user", "content": "a"}])
+        return stub
+
+    stub = asyncio.run(run())
+    assert len(main._response_cache) == 2
+    assert stub.calls == 4